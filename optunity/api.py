@@ -50,22 +50,41 @@ e.g. :mod:`optunity.solvers`.
 
 """
 
-import timeit
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import itertools
+import mmap
 import sys
 import operator
 import pickle
 import os
 import time
+import uuid
 
 # optunity imports
 import warnings
 
 from . import functions as fun
 from . import solvers
+from . import parallel
 from . import search_spaces
 from .solvers import solver_registry
 from .util import DocumentedNamedTuple as DocTup
-from .constraints import wrap_constraints
+
+try:
+    import numpy as np
+    _numpy_available = True
+except ImportError:
+    _numpy_available = False
+
+# function values used to default evaluations outside of the box
+_MINUS_INF = -sys.float_info.max
+_PLUS_INF = sys.float_info.max
+
+# write buffer used for checkpoints, call logs easily span several megabytes
+_SAVE_BUFFER_SIZE = 1 << 20
 
 
 def _manual_lines(solver_name=None):
@@ -138,6 +157,25 @@ time
                         'optimize_stats', ['num_evals', 'time'])
 
 
+@contextlib.contextmanager
+def _pmap_context(pmap, workers=None):
+    """Context manager yielding the map function to use.
+
+    :param pmap: the map function requested by the caller
+    :param workers: number of threads to evaluate with if ``pmap`` is the builtin ``map``
+    :type workers: int or None
+
+    Without ``workers``, this yields ``pmap`` as is.
+    The thread pool is shut down on exit.
+
+    """
+    if pmap is map and workers:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            yield parallel.create_executor_pmap(executor)
+    else:
+        yield pmap
+
+
 def suggest_solver(num_evals=50, solver_name=None, **kwargs):
     if solver_name:
         solvercls = solver_registry.get(solver_name)
@@ -156,7 +194,8 @@ def suggest_solver(num_evals=50, solver_name=None, **kwargs):
     return suggestion
 
 
-def maximize(f, num_evals=50, solver_name=None, pmap=map, save_dir=None, restore_file_path=None, **kwargs):
+def maximize(f, num_evals=50, solver_name=None, pmap=map, save_dir=None, restore_file_path=None,
+             overwrite=None, workers=None, **kwargs):
     """Basic function maximization routine. Maximizes ``f`` within
     the given box constraints.
 
@@ -166,6 +205,11 @@ def maximize(f, num_evals=50, solver_name=None, pmap=map, save_dir=None, restore
     :type solver_name: string
     :param pmap: the map function to use
     :type pmap: callable
+    :param overwrite: overwrite an existing save in ``save_dir``? See :func:`optimize`.
+    :type overwrite: bool or None
+    :param workers: if given and ``pmap`` is ``map``, evaluate ``f`` on a pool of this many threads,
+        which suits objectives that mostly wait on I/O
+    :type workers: int or None
     :param kwargs: box constraints, a dict of the following form
         ``{'parameter_name': [lower_bound, upper_bound], ...}``
     :returns: retrieved maximum, extra information and solver info
@@ -178,16 +222,20 @@ def maximize(f, num_evals=50, solver_name=None, pmap=map, save_dir=None, restore
     assert all([len(v) == 2 and v[0] < v[1]
                 for v in kwargs.values()]), 'Box constraints improperly specified: should be [lb, ub] pairs'
 
-    f = _wrap_hard_box_constraints(f, kwargs, -sys.float_info.max)
-
     suggestion = suggest_solver(num_evals, solver_name, **kwargs)
+    if not getattr(solver_registry.get(suggestion['solver_name']), 'samples_inside_box', False):
+        f = _wrap_hard_box_constraints(f, kwargs, _MINUS_INF)
+
     solver = make_solver(**suggestion)
-    solution, details = optimize(solver, f, maximize=True, max_evals=num_evals,
-                                 pmap=pmap, save_dir=save_dir, restore_file_path=restore_file_path)
+    with _pmap_context(pmap, workers) as pmap:
+        solution, details = optimize(solver, f, maximize=True, max_evals=num_evals,
+                                     pmap=pmap, save_dir=save_dir, restore_file_path=restore_file_path,
+                                     overwrite=overwrite)
     return solution, details, suggestion
 
 
-def minimize(f, num_evals=50, solver_name=None, pmap=map, save_dir=None, restore_file_path=None, **kwargs):
+def minimize(f, num_evals=50, solver_name=None, pmap=map, save_dir=None, restore_file_path=None,
+             overwrite=None, workers=None, **kwargs):
     """Basic function minimization routine. Minimizes ``f`` within
     the given box constraints.
 
@@ -197,6 +245,11 @@ def minimize(f, num_evals=50, solver_name=None, pmap=map, save_dir=None, restore
     :type solver_name: string
     :param pmap: the map function to use
     :type pmap: callable
+    :param overwrite: overwrite an existing save in ``save_dir``? See :func:`optimize`.
+    :type overwrite: bool or None
+    :param workers: if given and ``pmap`` is ``map``, evaluate ``f`` on a pool of this many threads,
+        which suits objectives that mostly wait on I/O
+    :type workers: int or None
     :param kwargs: box constraints, a dict of the following form
         ``{'parameter_name': [lower_bound, upper_bound], ...}``
     :returns: retrieved minimum, extra information and solver info
@@ -209,16 +262,174 @@ def minimize(f, num_evals=50, solver_name=None, pmap=map, save_dir=None, restore
     assert all([len(v) == 2 and v[0] < v[1]
                 for v in kwargs.values()]), 'Box constraints improperly specified: should be [lb, ub] pairs'
 
-    func = _wrap_hard_box_constraints(f, kwargs, sys.float_info.max)
-
     suggestion = suggest_solver(num_evals, solver_name, **kwargs)
+    if not getattr(solver_registry.get(suggestion['solver_name']), 'samples_inside_box', False):
+        f = _wrap_hard_box_constraints(f, kwargs, _PLUS_INF)
+
     solver = make_solver(**suggestion)
-    solution, details = optimize(solver, func, maximize=False, max_evals=num_evals,
-                                 pmap=pmap, save_dir=save_dir, restore_file_path=restore_file_path)
+    with _pmap_context(pmap, workers) as pmap:
+        solution, details = optimize(solver, f, maximize=False, max_evals=num_evals,
+                                     pmap=pmap, save_dir=save_dir, restore_file_path=restore_file_path,
+                                     overwrite=overwrite)
     return solution, details, suggestion
 
 
-def optimize(solver, func, maximize=True, max_evals=0, pmap=map, decoder=None, save_dir=None, restore_file_path=None):
+def _argbest(values, maximize=True):
+    """Returns the index of the best element in ``values`` in a single pass.
+
+    :param values: function values, e.g. ``f.call_log.values()``
+    :type values: sized iterable
+    :param maximize: find the maximum (True) or the minimum (False)?
+    :type maximize: bool
+
+    The reduction is done in NumPy when it is available and all values are numeric.
+    Ties resolve to the first occurrence, as with the builtin :func:`max`.
+    NaN values are ignored, unless all values are NaN.
+
+    >>> _argbest([1, 3, 2, 3])
+    1
+    >>> _argbest([1, 3, 2, 3], maximize=False)
+    0
+    >>> nan = float('nan')
+    >>> _argbest([1, nan, 2]), _argbest([nan, 1, 2], maximize=False), _argbest([nan, nan])
+    (2, 1, 0)
+
+    """
+    vals = None
+    if _numpy_available:
+        try:
+            vals = np.fromiter(values, dtype=np.float64, count=len(values))
+        except (TypeError, ValueError):
+            pass
+    if vals is None:
+        best_idx, best_val = None, None
+        for idx, val in enumerate(values):
+            if val != val:
+                # NaN
+                continue
+            if best_idx is None or (val > best_val if maximize else val < best_val):
+                best_idx, best_val = idx, val
+        return 0 if best_idx is None else best_idx
+    if np.isnan(vals).all():
+        return 0
+    return int(np.nanargmax(vals) if maximize else np.nanargmin(vals))
+
+
+def _adjust_max_evals(max_evals):
+    """Adjusts the maximum number of evaluations to the saving frequency.
+
+    A hack to avoid skipping some evaluations: :func:`optunity.functions.max_evals`
+    also counts the calls it interrupts to trigger a save, which happens every other evaluation.
+
+    >>> [_adjust_max_evals(n) for n in [0, 1, 4, 5]]
+    [-1, 1, 7, 9]
+
+    """
+    # TODO: handle saving frequency as a variable
+    half = max_evals // 2
+    return max_evals + 2 * half - (1 if max_evals % 2 == 0 else 0)
+
+
+_SaveRecord = collections.namedtuple('_SaveRecord', ['log_data', 'max_evals', 'num_evals', 'elapsed_time'])
+_SaveRecord.__doc__ = """Checkpoint of an ongoing optimization, as saved in ``save_dir``."""
+
+
+def _build_record(f, saved_f, original_max_evals, elapsed_time, max_evals):
+    """Builds the checkpoint of an ongoing optimization as a :class:`_SaveRecord`.
+
+    :param f: the logged objective function
+    :param saved_f: the restored checkpoint, None if we did not restore
+    :param original_max_evals: number of evaluations requested by the user
+    :param elapsed_time: wall clock time spent so far, including restored runs
+    :param max_evals: the adjusted maximum number of evaluations
+
+    """
+    if saved_f:
+        # In this case we are updating the saved_file.
+        done_evals = saved_f.max_evals
+    else:
+        # We are using a new file. (No restore file was provided).
+        done_evals = original_max_evals
+    if len(f.call_log) == done_evals:
+        num_evaluations = max_evals
+    else:
+        num_evaluations = len(f.call_log)
+    return _SaveRecord(log_data=f.call_log.data, max_evals=original_max_evals,
+                       num_evals=num_evaluations, elapsed_time=elapsed_time)
+
+
+def _save_checkpoint(path, record):
+    """Pickles the checkpoint ``record`` to ``path``."""
+    # write to a temporary file first, so an interrupted save never corrupts the previous checkpoint
+    # unlike tempfile.mkstemp, open() creates it with the permissions given by the umask
+    dirname, basename = os.path.split(os.path.abspath(path))
+    tmp_path = os.path.join(dirname, '.{}.{}.tmp'.format(basename, uuid.uuid4().hex))
+    f_handler = open(tmp_path, 'xb', _SAVE_BUFFER_SIZE)
+    try:
+        with f_handler:
+            pickle.dump(record, f_handler, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _load_checkpoint(path):
+    """Loads a checkpoint that was saved with :func:`_save_checkpoint`.
+
+    >>> import shutil, tempfile
+    >>> save_dir = tempfile.mkdtemp()
+    >>> path = os.path.join(save_dir, 'save.pkl')
+    >>> log_data = collections.OrderedDict([(fun.Args(x=1.0, y=0.5), 2.0), (fun.Args(x=0.0, y=1.0), -1.0)])
+    >>> record = _SaveRecord(log_data=log_data, max_evals=10, num_evals=2, elapsed_time=1.5)
+    >>> _save_checkpoint(path, record)
+    >>> _load_checkpoint(path) == record
+    True
+
+    Checkpoints written by earlier versions are pickled dicts.
+
+    >>> with open(path, 'wb') as f_handler:
+    ...     pickle.dump(dict(record._asdict()), f_handler)
+    >>> _load_checkpoint(path) == record
+    True
+    >>> shutil.rmtree(save_dir)
+
+    """
+    with open(path, 'rb') as f_handler:
+        # unpickle straight from the page cache rather than copying the file through read()
+        with mmap.mmap(f_handler.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            saved = pickle.loads(buf)
+    # checkpoints written by earlier versions are plain dicts
+    if isinstance(saved, dict):
+        saved = _SaveRecord(**saved)
+    return saved
+
+
+def _env_flag(name):
+    """Reads the boolean environment variable ``name``, which is False when unset.
+
+    :raises ValueError: if the value is not one of ``1``, ``true``, ``yes``, ``on``,
+        ``0``, ``false``, ``no``, ``off`` or empty (case insensitive)
+
+    >>> os.environ['OPTUNITY_TEST_FLAG'] = 'No'
+    >>> _env_flag('OPTUNITY_TEST_FLAG'), _env_flag('OPTUNITY_TEST_FLAG_UNSET')
+    (False, False)
+    >>> os.environ['OPTUNITY_TEST_FLAG'] = 'true'
+    >>> _env_flag('OPTUNITY_TEST_FLAG')
+    True
+    >>> del os.environ['OPTUNITY_TEST_FLAG']
+
+    """
+    value = os.environ.get(name, '').strip().lower()
+    if value in ('1', 'true', 'yes', 'on'):
+        return True
+    if value in ('', '0', 'false', 'no', 'off'):
+        return False
+    raise ValueError('Invalid value for environment variable ' + name + ': ' + repr(os.environ[name]))
+
+
+def optimize(solver, func, maximize=True, max_evals=0, pmap=map, decoder=None, save_dir=None, restore_file_path=None,
+             overwrite=None):
     """Optimizes func with given solver.
 
     :param solver: the solver to be used, for instance a result from :func:`optunity.make_solver`
@@ -232,6 +443,9 @@ def optimize(solver, func, maximize=True, max_evals=0, pmap=map, decoder=None, s
     :type pmap: function
     :param save_dir: directory where we wish to save the evaluations.
     :param restore_file_path: file from which we wish to restore our evaluations.
+    :param overwrite: overwrite an existing save in ``save_dir``? If not, a ``FileExistsError`` is raised.
+        Defaults to the ``OPTUNITY_OVERWRITE`` environment variable, e.g. ``true`` or ``false``.
+    :type overwrite: bool or None
 
     Returns the solution and a namedtuple with further details.
     Please refer to docs of optunity.maximize_results
@@ -249,89 +463,53 @@ def optimize(solver, func, maximize=True, max_evals=0, pmap=map, decoder=None, s
     saved_f = None
     if restore_file_path:
         # A restore file path was provided.
-        with open(restore_file_path, 'rb') as f_handler:
-            saved_f = pickle.load(f_handler)
-    else:
-        # A restore file path was provided. A save dir was provided but the new evaluations might overwrite an existing
-        # file with the same name.
-        # We ask the user if she wants to continue training or abort it.
-        if save_dir:
-            if os.path.isfile(os.path.join(save_dir, 'optunity_save_{}_evals.pkl'.format(original_max_evals))):
-                valid = {"yes": True, "y": True, "ye": True,
-                         "no": False, "n": False}
-                print('######## WARNING ########')
-                print("You are about to overwrite an existing save.")
-                print("Are you sure you want to proceed [y/n]:\n")
-                while True:
-                    choice = input().lower()
-                    if choice in valid:
-                        if valid[choice]:
-                            print("Continuing the process !!!")
-                            break
-                        else:
-                            print("Aborting run !!!")
-                            sys.exit(999)
-                    else:
-                        sys.stdout.write("Please respond with 'yes' or 'no' "
-                                         "(or 'y' or 'n').\n")
-
-    if saved_f:
-        # We are restoring.
+        saved_f = _load_checkpoint(restore_file_path)
 
         if max_evals == 0:
             # max_evals defaults to 0 when no value is provided.
             # In this case we use the max_evals that was saved in the pickle.
-            original_max_evals = saved_f['max_evals']
-            max_evals = saved_f['max_evals']
-
-        # A hack to avoid skipping some evaluations.
-        # We are now saving after each evaluation.
-        # TODO: handle saving frequency as a variable
-        missing_evals = max_evals // 2
-        if max_evals % 2 == 0:
-            max_evals += 2 * missing_evals - 1
-        else:
-            max_evals += 2 * missing_evals
+            original_max_evals = saved_f.max_evals
+            max_evals = saved_f.max_evals
+
+    save_path = None
+    if save_dir:
+        save_path = os.path.join(save_dir, 'optunity_save_{}_evals.pkl'.format(original_max_evals))
+        if not saved_f:
+            # The new evaluations might overwrite an existing file with the same name.
+            if overwrite is None:
+                overwrite = _env_flag('OPTUNITY_OVERWRITE')
+            if not overwrite and os.path.isfile(save_path):
+                raise FileExistsError(save_path)
+
+    max_evals = _adjust_max_evals(max_evals)
+
+    if saved_f:
+        # We are restoring.
 
         # The user might decide to reduce the number of evaluations.
-        if max_evals - saved_f['num_evals'] <= 0:
+        if max_evals - saved_f.num_evals <= 0:
             # If at the new number of iterations was already done. We inform the user and return the best results.
             print("Already done at least the correct number opf evaluations.")
-            if max_evals > 0:
-                f = fun.max_evals(max_evals)(func)
-            else:
-                f = func
 
-            # How many evaluations we already did.
-            f.num_evals = saved_f['num_evals']
-
-            f = fun.logged(f)
-
-            # Restore the log.
-            while len(saved_f['log_data']) > 0:
-                key, value = saved_f['log_data'].popitem()
-                f.call_log.insert(value, **key._asdict())
+            # Nothing will be evaluated, so we read the restored log as is.
+            call_log = fun.CallLog.from_data(saved_f.log_data)
 
             # We return the best solution.
             report = None
-            if maximize:
-                index, _ = max(enumerate(f.call_log.values()), key=operator.itemgetter(1))
-            else:
-                index, _ = min(enumerate(f.call_log.values()), key=operator.itemgetter(1))
-            solution = list(f.call_log.keys())[index]._asdict()
+            index = _argbest(call_log.values(), maximize)
+            solution = next(itertools.islice(call_log.keys(), index, None))._asdict()
 
             # This was in the original code.
             # TODO why is this necessary?
             if decoder:
                 solution = decoder(solution)
 
-            optimum = f.call_log.get(**solution)
-            num_evals = len(f.call_log)
+            optimum = call_log.get(**solution)
+            call_dict, num_evals = call_log.to_dict_with_len()
 
             # use namedtuple to enforce uniformity in case of changes
-            stats = optimize_stats(num_evals, saved_f['elapsed_time'])
+            stats = optimize_stats(num_evals, saved_f.elapsed_time)
 
-            call_dict = f.call_log.to_dict()
             return solution, optimize_results(optimum, stats._asdict(),
                                               call_dict, report)
 
@@ -341,27 +519,20 @@ def optimize(solver, func, maximize=True, max_evals=0, pmap=map, decoder=None, s
             f = func
 
         # How many evaluations we already did.
-        f.num_evals = saved_f['num_evals']
+        f.num_evals = saved_f.num_evals
 
         f = fun.logged(f)
 
-        # Restore the log.
-        while len(saved_f['log_data']) > 0:
-            key, value = saved_f['log_data'].popitem()
-            f.call_log.insert(value, **key._asdict())
+        # Restore the log, the loaded copy is no longer needed once it is part of the call log.
+        f.call_log.data.update(saved_f.log_data)
+        saved_f = saved_f._replace(log_data=None)
 
         # Restoring the elapsed time.
-        time_var = timeit.default_timer() - saved_f['elapsed_time']
+        elapsed_offset = saved_f.elapsed_time
 
     else:
         # We are not restoring.
 
-        missing_evals = max_evals // 2
-        if max_evals % 2 == 0:
-            max_evals += 2 * missing_evals - 1
-        else:
-            max_evals += 2 * missing_evals
-
         if max_evals > 0:
             f = fun.max_evals(max_evals)(func)
         else:
@@ -369,7 +540,16 @@ def optimize(solver, func, maximize=True, max_evals=0, pmap=map, decoder=None, s
 
         f = fun.logged(f)
 
-        time_var = timeit.default_timer()
+        elapsed_offset = 0.0
+
+    # wall clock time, including time spent in restored runs
+    t0 = time.perf_counter()
+
+    def elapsed():
+        return time.perf_counter() - t0 + elapsed_offset
+
+    # number of evaluations in the most recent checkpoint, used to avoid rewriting identical checkpoints
+    last_saved = -1
     while True:
         try:
             # If we reload a file while we have already done the required number of evaluations, we just return the
@@ -386,72 +566,36 @@ def optimize(solver, func, maximize=True, max_evals=0, pmap=map, decoder=None, s
         except fun.ModuloEvaluationsException:
             # We need to save f in order for it to be used later.
             if save_dir:
-                if saved_f:
-                    # In this case we are updating the saved_file.
-                    if len(f.call_log) == saved_f['max_evals']:
-                        num_evaluations = max_evals
-                    else:
-                        num_evaluations = len(f.call_log)
-                    dict_to_save = {'log_data': f.call_log.data, 'max_evals': original_max_evals,
-                                    'num_evals': num_evaluations, 'elapsed_time': timeit.default_timer() - time_var}
-                else:
-                    # We are using a new file. (No restore file was provided).
-                    if len(f.call_log) == original_max_evals:
-                        num_evaluations = max_evals
-                    else:
-                        num_evaluations = len(f.call_log)
-                    dict_to_save = {'log_data': f.call_log.data, 'max_evals': original_max_evals,
-                                    'num_evals': num_evaluations, 'elapsed_time': timeit.default_timer() - time_var}
-                # Saving the necessary information.
-                with open(os.path.join(save_dir, 'optunity_save_{}_evals.pkl'.format(original_max_evals)), 'wb') \
-                        as f_handler:
-                    pickle.dump(dict_to_save, f_handler)
+                record = _build_record(f, saved_f, original_max_evals, elapsed(), max_evals)
+                _save_checkpoint(save_path, record)
+                last_saved = record.num_evals
         except fun.MaximumEvaluationsException:
             # early stopping because maximum number of evaluations is reached
             # retrieve solution from the call log
             report = None
-            if maximize:
-                index, _ = max(enumerate(f.call_log.values()), key=operator.itemgetter(1))
-            else:
-                index, _ = min(enumerate(f.call_log.values()), key=operator.itemgetter(1))
-            solution = list(f.call_log.keys())[index]._asdict()
+            index = _argbest(f.call_log.values(), maximize)
+            solution = next(itertools.islice(f.call_log.keys(), index, None))._asdict()
 
             if save_dir:
                 # If the user provided a path to save a pickle.
-                if saved_f:
-                    if len(f.call_log) == saved_f['max_evals']:
-                        num_evaluations = max_evals
-                    else:
-                        num_evaluations = len(f.call_log)
-                    dict_to_save = {'log_data': f.call_log.data, 'max_evals': original_max_evals,
-                                    'num_evals': num_evaluations, 'elapsed_time': timeit.default_timer() - time_var}
-                else:
-                    # The user did not provide us with a path to save.
-                    if len(f.call_log) == original_max_evals:
-                        num_evaluations = max_evals
-                    else:
-                        num_evaluations = len(f.call_log)
-                    dict_to_save = {'log_data': f.call_log.data, 'max_evals': original_max_evals,
-                                    'num_evals': num_evaluations, 'elapsed_time': timeit.default_timer() - time_var}
-                with open(os.path.join(save_dir, 'optunity_save_{}_evals.pkl'.format(original_max_evals)), 'wb') \
-                        as f_handler:
-                    pickle.dump(dict_to_save, f_handler)
+                record = _build_record(f, saved_f, original_max_evals, elapsed(), max_evals)
+                if record.num_evals != last_saved:
+                    _save_checkpoint(save_path, record)
             # No need to loop again
             break
 
-    time_var = timeit.default_timer() - time_var
+    time_var = elapsed()
 
     # TODO why is this necessary?
     if decoder:
         solution = decoder(solution)
 
     optimum = f.call_log.get(**solution)
-    num_evals = len(f.call_log)
+    call_dict, num_evals = f.call_log.to_dict_with_len()
 
     # use namedtuple to enforce uniformity in case of changes
     stats = optimize_stats(num_evals, time_var)
 
-    call_dict = f.call_log.to_dict()
     return solution, optimize_results(optimum, stats._asdict(),
                                       call_dict, report)
 
@@ -468,6 +612,11 @@ Optimizes func with given solver.
 :type max_evals: int
 :param pmap: the map() function to use, to vectorize use :func:`optunity.pmap`
 :type pmap: function
+:param save_dir: directory where we wish to save the evaluations.
+:param restore_file_path: file from which we wish to restore our evaluations.
+:param overwrite: overwrite an existing save in ``save_dir``? If not, a ``FileExistsError`` is raised.
+    Defaults to the ``OPTUNITY_OVERWRITE`` environment variable, e.g. ``true`` or ``false``.
+:type overwrite: bool or None
 
 Returns the solution and a ``namedtuple`` with further details.
 ''' + optimize_results.__doc__ + optimize_stats.__doc__
@@ -510,6 +659,31 @@ def wrap_call_log(f, call_dict):
     return f
 
 
+def _box_key(box):
+    """Returns a canonical, hashable representation of the box constraints ``box``.
+
+    >>> _box_key({'y': [0, 1], 'x': [-1, 1]})
+    (('x', (-1.0, 1.0)), ('y', (0.0, 1.0)))
+
+    """
+    return tuple(sorted((k, (float(v[0]), float(v[1]))) for k, v in box.items()))
+
+
+@functools.lru_cache(maxsize=64)
+def _box_check(box_key):
+    """Returns a function that checks whether a dict of keyword arguments
+    lies strictly within the box represented by ``box_key`` (see :func:`_box_key`).
+
+    Checks are memoized per box, so repeated optimizations over the same box share them.
+
+    """
+    bounds = [(k, b[0], b[1]) for k, b in box_key]
+
+    def inside(kwargs):
+        return all(lb < kwargs[k] < ub for k, lb, ub in bounds)
+    return inside
+
+
 def _wrap_hard_box_constraints(f, box, default):
     """Places hard box constraints on the domain of ``f``
     and defaults function values if constraints are violated.
@@ -522,11 +696,77 @@ def _wrap_hard_box_constraints(f, box, default):
         are violated
     :type default: number
 
+    >>> fc = _wrap_hard_box_constraints(lambda x: x, {'x': [0, 1]}, -1)
+    >>> fc(x=0.5)
+    0.5
+    >>> fc(x=1)
+    -1
+
+    """
+    if not box:
+        return f
+
+    inside = _box_check(_box_key(box))
+
+    @fun.wraps(f)
+    def wrapped_f(*args, **kwargs):
+        if not inside(kwargs):
+            return default
+        return f(*args, **kwargs)
+    return wrapped_f
+
+
+def _search_space_key(value):
+    """Returns a hashable representation of ``value``, a (part of a) search space.
+
+    Types are part of the key, as :class:`optunity.search_spaces.SearchTree`
+    treats plain dicts differently from other mappings.
+
+    >>> _search_space_key({'x': [0, 1]}) == _search_space_key(collections.OrderedDict(x=[0, 1]))
+    False
+
     """
-    return wrap_constraints(f, default, range_oo=box)
+    if isinstance(value, dict):
+        return type(value), tuple((k, _search_space_key(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_search_space_key(v) for v in value)
+    return type(value), value
 
 
-def maximize_structured(f, search_space, num_evals=50, pmap=map, save_dir=None, restore_file_path=None):
+# most recently used search trees, see _search_tree
+_SEARCH_TREES = collections.OrderedDict()
+_SEARCH_TREES_SIZE = 32
+
+
+def _search_tree(search_space):
+    """Returns the :class:`optunity.search_spaces.SearchTree` of ``search_space``
+    along with its box constraints.
+
+    The most recently used trees are memoized, search spaces that can't be hashed
+    (see :func:`_search_space_key`) are built every time.
+    The returned tree and box are shared and must not be modified.
+
+    """
+    key = _search_space_key(search_space)
+    try:
+        hash(key)
+    except TypeError:
+        tree = search_spaces.SearchTree(search_space)
+        return tree, tree.to_box()
+    try:
+        _SEARCH_TREES.move_to_end(key)
+        return _SEARCH_TREES[key]
+    except KeyError:
+        pass
+    tree = search_spaces.SearchTree(search_space)
+    result = _SEARCH_TREES[key] = tree, tree.to_box()
+    if len(_SEARCH_TREES) > _SEARCH_TREES_SIZE:
+        _SEARCH_TREES.popitem(last=False)
+    return result
+
+
+def maximize_structured(f, search_space, num_evals=50, pmap=map, save_dir=None, restore_file_path=None,
+                        overwrite=None, workers=None):
     """Basic function maximization routine. Maximizes ``f`` within
     the given box constraints.
 
@@ -535,14 +775,18 @@ def maximize_structured(f, search_space, num_evals=50, pmap=map, save_dir=None,
     :param num_evals: number of permitted function evaluations
     :param pmap: the map function to use
     :type pmap: callable
+    :param overwrite: overwrite an existing save in ``save_dir``? See :func:`optimize`.
+    :type overwrite: bool or None
+    :param workers: if given and ``pmap`` is ``map``, evaluate ``f`` on a pool of this many threads,
+        which suits objectives that mostly wait on I/O
+    :type workers: int or None
     :returns: retrieved maximum, extra information and solver info
 
     This function will implicitly choose an appropriate solver and
     its initialization based on ``num_evals`` and the box constraints.
 
     """
-    tree = search_spaces.SearchTree(search_space)
-    box = tree.to_box()
+    tree, box = _search_tree(search_space)
 
     # we need to position the call log here
     # because the function signature used later on is internal logic
@@ -550,16 +794,19 @@ def maximize_structured(f, search_space, num_evals=50, pmap=map, save_dir=None,
 
     # wrap the decoder and constraints for the internal search space representation
     f = tree.wrap_decoder(f)
-    f = _wrap_hard_box_constraints(f, box, -sys.float_info.max)
+    f = _wrap_hard_box_constraints(f, box, _MINUS_INF)
 
     suggestion = suggest_solver(num_evals, "particle swarm", **box)
     solver = make_solver(**suggestion)
-    solution, details = optimize(solver, f, maximize=True, max_evals=num_evals,
-                                 pmap=pmap, decoder=tree.decode, save_dir=save_dir, restore_file_path=restore_file_path)
+    with _pmap_context(pmap, workers) as pmap:
+        solution, details = optimize(solver, f, maximize=True, max_evals=num_evals,
+                                     pmap=pmap, decoder=tree.decode, save_dir=save_dir,
+                                     restore_file_path=restore_file_path, overwrite=overwrite)
     return solution, details, suggestion
 
 
-def minimize_structured(f, search_space, num_evals=50, pmap=map, save_dir=None, restore_file_path=None):
+def minimize_structured(f, search_space, num_evals=50, pmap=map, save_dir=None, restore_file_path=None,
+                        overwrite=None, workers=None):
     """Basic function minimization routine. Minimizes ``f`` within
     the given box constraints.
 
@@ -568,14 +815,18 @@ def minimize_structured(f, search_space, num_evals=50, pmap=map, save_dir=None,
     :param num_evals: number of permitted function evaluations
     :param pmap: the map function to use
     :type pmap: callable
+    :param overwrite: overwrite an existing save in ``save_dir``? See :func:`optimize`.
+    :type overwrite: bool or None
+    :param workers: if given and ``pmap`` is ``map``, evaluate ``f`` on a pool of this many threads,
+        which suits objectives that mostly wait on I/O
+    :type workers: int or None
     :returns: retrieved maximum, extra information and solver info
 
     This function will implicitly choose an appropriate solver and
     its initialization based on ``num_evals`` and the box constraints.
 
     """
-    tree = search_spaces.SearchTree(search_space)
-    box = tree.to_box()
+    tree, box = _search_tree(search_space)
 
     # we need to position the call log here
     # because the function signature used later on is internal logic
@@ -583,10 +834,12 @@ def minimize_structured(f, search_space, num_evals=50, pmap=map, save_dir=None,
 
     # wrap the decoder and constraints for the internal search space representation
     f = tree.wrap_decoder(f)
-    f = _wrap_hard_box_constraints(f, box, sys.float_info.max)
+    f = _wrap_hard_box_constraints(f, box, _PLUS_INF)
 
     suggestion = suggest_solver(num_evals, "particle swarm", **box)
     solver = make_solver(**suggestion)
-    solution, details = optimize(solver, f, maximize=False, max_evals=num_evals,
-                                 pmap=pmap, decoder=tree.decode, save_dir=save_dir, restore_file_path=restore_file_path)
+    with _pmap_context(pmap, workers) as pmap:
+        solution, details = optimize(solver, f, maximize=False, max_evals=num_evals,
+                                     pmap=pmap, decoder=tree.decode, save_dir=save_dir,
+                                     restore_file_path=restore_file_path, overwrite=overwrite)
     return solution, details, suggestion
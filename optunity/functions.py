@@ -120,6 +120,14 @@ class CallLog(object):
         self._data =collections.OrderedDict()
         self._lock = threading.Lock()
 
+    def __getstate__(self):
+        # locks can't be pickled
+        return {'_data': self._data}
+
+    def __setstate__(self, state):
+        self._data = state['_data']
+        self._lock = threading.Lock()
+
     @property
     def lock(self):
         return self._lock
@@ -207,6 +215,24 @@ class CallLog(object):
             log.insert(v, **args)
         return log
 
+    @staticmethod
+    def from_data(data):
+        """Creates a call log around ``data``, an ordered dict mapping :class:`Args` to function values.
+
+        ``data`` is used as the internal representation of the call log as is, without copying.
+
+        >>> data = collections.OrderedDict([(Args(x=1), 2), (Args(x=2), 3)])
+        >>> log = CallLog.from_data(data)
+        >>> log.get(x=2)
+        3
+        >>> log.data is data
+        True
+
+        """
+        log = CallLog()
+        log._data = data
+        return log
+
     def to_dict(self):
         """Returns given call_log into a dictionary.
 
@@ -235,6 +261,23 @@ class CallLog(object):
         else:
             return {'args': {}, 'values': []}
 
+    def to_dict_with_len(self):
+        """Returns the call log as a dictionary, see :func:`CallLog.to_dict`,
+        along with the number of logged calls.
+
+        >>> call_log = CallLog()
+        >>> call_log.insert(3, x=1, y=2)
+        >>> call_log.insert(4, x=2, y=2)
+        >>> d, n = call_log.to_dict_with_len()
+        >>> d['values']
+        [3, 4]
+        >>> n
+        2
+
+        """
+        d = self.to_dict()
+        return d, len(d['values'])
+
 
 def logged(f):
     """Decorator that logs unique calls to ``f``.
@@ -316,6 +359,7 @@ def negated(f):
 class MaximumEvaluationsException(Exception):
     """Raised when the maximum number of function evaluations are used."""
     def __init__(self, max_evals):
+        super().__init__(max_evals)
         self._max_evals = max_evals
 
     @property
@@ -327,6 +371,7 @@ class MaximumEvaluationsException(Exception):
 class ModuloEvaluationsException(Exception):
     """Raised when the number of function evaluations without saving are used."""
     def __init__(self, num_evals):
+        super().__init__(num_evals)
         self._num_evals = num_evals
 
     @property
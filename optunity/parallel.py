@@ -31,10 +31,15 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import threading
+import collections
+import concurrent.futures
 import copy
 import functools
+import importlib.util
+import io
+import pickle
 
-__all__ = ['pmap', 'Future', 'create_pmap']
+__all__ = ['pmap', 'loky_pmap', 'Future', 'create_pmap', 'create_executor_pmap']
 
 def _fun(f, q_in, q_out):
     while True:
@@ -48,6 +53,60 @@ def _fun(f, q_in, q_out):
         else:
             q_out.put((i, value))
 
+def _call(f, x):
+    """Evaluates ``f(*x)`` in a worker, along with the resulting call log key if ``f`` is logged."""
+    value = f(*x)
+    if hasattr(f, 'call_log'):
+        return value, list(f.call_log.keys())[-1]
+    return value
+
+def _dumps_with_empty_logs(f):
+    """Serializes ``f`` with cloudpickle, with an empty log in place of every call log it refers to.
+
+    Workers only need to report their own calls, so this avoids sending
+    all calls logged so far along with every task.
+
+    """
+    import cloudpickle
+    from .functions import CallLog
+
+    class EmptyLogPickler(cloudpickle.Pickler):
+        dispatch_table = collections.ChainMap({CallLog: lambda call_log: (CallLog, ())},
+                                              cloudpickle.Pickler.dispatch_table)
+
+    buf = io.BytesIO()
+    EmptyLogPickler(buf, protocol=pickle.HIGHEST_PROTOCOL).dump(f)
+    return buf.getvalue()
+
+def _call_pickled(payload, x):
+    """Evaluates ``f(*x)`` like :func:`_call`, with ``f`` serialized by :func:`_dumps_with_empty_logs`."""
+    return _call(pickle.loads(payload), x)
+
+def create_executor_pmap(executor):
+    """Creates a map function that evaluates all calls on ``executor``.
+
+    :param executor: the executor to submit calls to
+    :type executor: :class:`concurrent.futures.Executor`
+    :returns: a map function, returning a list of results
+
+    When a call raises, e.g. because the maximum number of evaluations is
+    reached, pending calls are cancelled and running calls are awaited before
+    the exception propagates, so no evaluations are left in flight.
+
+    """
+    def executor_pmap(f, *args):
+        futures = [executor.submit(f, *x) for x in zip(*args)]
+        try:
+            return [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+            concurrent.futures.wait(futures)
+    return executor_pmap
+
+# loky is imported when it is used, importing it takes longer than importing optunity
+_loky_available = importlib.util.find_spec('loky') is not None
+
 try:
     import multiprocessing
 
@@ -90,9 +149,48 @@ try:
         else:
             return [x for i, x in sorted(res)]
 
+    def loky_pmap(f, *args, **kwargs):
+        """Parallel map using a reusable loky process pool.
+
+        :param f: the callable
+        :param args: arguments to f, as iterables
+        :returns: a list containing the results
+
+        Tasks are serialized with cloudpickle, so closures and lambdas can be
+        evaluated in parallel, also on platforms that spawn rather than fork
+        worker processes (e.g. Windows). Workers start from an empty call log,
+        the calls they make are added to the call log of ``f``.
+
+        """
+        if not _loky_available:
+            raise ImportError('loky_pmap requires loky but it is missing.')
+        import loky
+
+        nprocs = kwargs.get('number_of_processes', multiprocessing.cpu_count())
+        executor = loky.get_reusable_executor(max_workers=nprocs)
+        payload = _dumps_with_empty_logs(f)
+        res = list(executor.map(functools.partial(_call_pickled, payload), zip(*args)))
+
+        if hasattr(f, 'call_log'):
+            for value, k in res:
+                f.call_log[k] = value
+            return [x for x, _ in res]
+        else:
+            return res
+
     def create_pmap(number_of_processes):
+        """Creates a parallel map using ``number_of_processes`` processes.
+
+        Uses :func:`loky_pmap` when loky is installed and :func:`pmap` otherwise.
+
+        """
+        if _loky_available:
+            parallel_map = loky_pmap
+        else:
+            parallel_map = pmap
+
         def pmap_bound(f, *args):
-            return pmap(f, *args, number_of_processes=number_of_processes)
+            return parallel_map(f, *args, number_of_processes=number_of_processes)
         return pmap_bound
 
     # http://code.activestate.com/recipes/84317-easy-threading-with-futures/
@@ -137,6 +235,8 @@ try:
 
 except ImportError:
     pmap = map
+    loky_pmap = None
+    create_pmap = None
     Future = None
 
 if __name__ == '__main__':
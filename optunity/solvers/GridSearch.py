@@ -72,6 +72,9 @@ class GridSearch(Solver):
 
     """
 
+    # the grid spans the shrunk bounds of suggest_from_box
+    samples_inside_box = True
+
     def __init__(self, **kwargs):
         """Initializes the solver with a tuple indicating parameter values.
 
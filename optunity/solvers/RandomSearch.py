@@ -59,6 +59,9 @@ class RandomSearch(Solver):
 
     """
 
+    # samples are drawn within the shrunk bounds of suggest_from_box
+    samples_inside_box = True
+
 
     def __init__(self, num_evals, **kwargs):
         """Initializes the solver with bounds and a number of allowed evaluations.
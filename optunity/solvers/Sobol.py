@@ -100,6 +100,8 @@ class Sobol(Solver):
     Please refer to |sobol| for details on this algorithm.
     """
 
+    # the sequence is scaled to the shrunk bounds of suggest_from_box
+    samples_inside_box = True
 
     def __init__(self, num_evals, seed=None, skip=None, **kwargs):
         """
@@ -69,6 +69,10 @@ class Solver(SolverBase):
     """Base class of all Optunity solvers.
     """
 
+    #: Whether solvers configured through ``suggest_from_box`` only evaluate points
+    #: strictly inside the box, in which case no hard box constraints are required.
+    samples_inside_box = False
+
     @abc.abstractmethod
     def optimize(self, f, maximize=True, pmap=map):
         """Optimizes ``f``.
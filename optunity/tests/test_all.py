@@ -3,7 +3,7 @@
 import unittest
 import doctest
 
-modules = ['cross_validation', 'functions', 'solvers', 'communication',
+modules = ['api', 'cross_validation', 'functions', 'solvers', 'communication',
            'solvers.GridSearch', 'solvers.RandomSearch', 'solvers.ParticleSwarm',
            'solvers.CMAES', 'solvers.NelderMead']
 
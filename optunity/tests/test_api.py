@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+# Behavioral tests of the top-level API that go beyond its doctests.
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import optunity
+from optunity import api
+
+
+def f(x, y):
+    # sleep a little, so elapsed times are measurable
+    time.sleep(0.001)
+    return -(x - 1) ** 2 - (y - 2) ** 2
+
+
+def save_file(save_dir, num_evals):
+    return os.path.join(save_dir, 'optunity_save_{}_evals.pkl'.format(num_evals))
+
+
+class TestSaveRestore(unittest.TestCase):
+
+    def setUp(self):
+        self.save_dir = tempfile.mkdtemp()
+        self.solution, self.details, _ = optunity.maximize(f, 20, x=[-5, 5], y=[-5, 5],
+                                                           save_dir=self.save_dir)
+        self.save_path = save_file(self.save_dir, 20)
+
+    def tearDown(self):
+        shutil.rmtree(self.save_dir)
+
+    def test_save(self):
+        self.assertEqual(self.details.stats['num_evals'], 20)
+        self.assertEqual(os.listdir(self.save_dir), [os.path.basename(self.save_path)])
+
+        saved = api._load_checkpoint(self.save_path)
+        self.assertEqual(saved.max_evals, 20)
+        self.assertEqual(len(saved.log_data), 20)
+        self.assertLessEqual(saved.elapsed_time, self.details.stats['time'])
+        self.assertEqual(max(saved.log_data.values()), self.details.optimum)
+
+    def test_restore_more_evals(self):
+        saved = api._load_checkpoint(self.save_path)
+        solution, details, _ = optunity.maximize(f, 30, x=[-5, 5], y=[-5, 5], save_dir=self.save_dir,
+                                                 restore_file_path=self.save_path)
+        self.assertEqual(details.stats['num_evals'], 30)
+        self.assertGreater(details.stats['time'], saved.elapsed_time)
+        self.assertGreaterEqual(details.optimum, self.details.optimum)
+        # the restored calls come first in the call log
+        self.assertEqual(details.call_log['values'][:20], self.details.call_log['values'])
+
+        resaved = api._load_checkpoint(save_file(self.save_dir, 30))
+        self.assertEqual(resaved.max_evals, 30)
+        self.assertEqual(len(resaved.log_data), 30)
+        self.assertGreater(resaved.elapsed_time, saved.elapsed_time)
+        self.assertEqual(max(resaved.log_data.values()), details.optimum)
+
+    def test_restore_fewer_evals(self):
+        saved = api._load_checkpoint(self.save_path)
+        solution, details, _ = optunity.maximize(f, 10, x=[-5, 5], y=[-5, 5],
+                                                 restore_file_path=self.save_path)
+        # nothing is evaluated, the restored run is reported as is
+        self.assertEqual(details.stats['num_evals'], 20)
+        self.assertEqual(details.stats['time'], saved.elapsed_time)
+        self.assertEqual(details.optimum, self.details.optimum)
+        self.assertEqual(solution, self.solution)
+
+
+class TestOverwrite(unittest.TestCase):
+
+    def setUp(self):
+        self.save_dir = tempfile.mkdtemp()
+        optunity.maximize(f, 10, x=[-5, 5], y=[-5, 5], save_dir=self.save_dir)
+        self.environ = os.environ.pop('OPTUNITY_OVERWRITE', None)
+
+    def tearDown(self):
+        shutil.rmtree(self.save_dir)
+        os.environ.pop('OPTUNITY_OVERWRITE', None)
+        if self.environ is not None:
+            os.environ['OPTUNITY_OVERWRITE'] = self.environ
+
+    def maximize(self, **kwargs):
+        return optunity.maximize(f, 10, x=[-5, 5], y=[-5, 5], save_dir=self.save_dir, **kwargs)
+
+    def test_existing_save(self):
+        self.assertRaises(FileExistsError, self.maximize)
+        self.assertRaises(FileExistsError, self.maximize, overwrite=False)
+
+    def test_overwrite(self):
+        _, details, _ = self.maximize(overwrite=True)
+        saved = api._load_checkpoint(save_file(self.save_dir, 10))
+        self.assertEqual(list(saved.log_data.values()), details.call_log['values'])
+
+    def test_environment(self):
+        os.environ['OPTUNITY_OVERWRITE'] = 'false'
+        self.assertRaises(FileExistsError, self.maximize)
+        os.environ['OPTUNITY_OVERWRITE'] = 'true'
+        self.maximize()
+        # an explicit argument takes precedence
+        self.assertRaises(FileExistsError, self.maximize, overwrite=False)
+        os.environ['OPTUNITY_OVERWRITE'] = 'maybe'
+        self.assertRaises(ValueError, self.maximize)
+
+
+class TestWorkers(unittest.TestCase):
+
+    def test_num_evals(self):
+        lock = threading.Lock()
+        calls = []
+
+        def g(x, y):
+            with lock:
+                calls.append(threading.get_ident())
+            return f(x, y)
+
+        for solver_name in ['particle swarm', 'random search']:
+            del calls[:]
+            _, details, _ = optunity.maximize(g, 50, x=[-5, 5], y=[-5, 5],
+                                              solver_name=solver_name, workers=4)
+            args = details.call_log['args']
+            self.assertEqual(details.stats['num_evals'], 50)
+            self.assertEqual(len(set(zip(args['x'], args['y']))), 50)
+            # evaluations that were still running have finished before maximize returned
+            time.sleep(0.01)
+            self.assertEqual(len(calls), 50)
+            self.assertGreater(len(set(calls)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
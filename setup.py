@@ -21,12 +21,14 @@ setup(
                    'Topic :: Scientific/Engineering',
                    'Topic :: Scientific/Engineering :: Artificial Intelligence',
                    'Topic :: Scientific/Engineering :: Information Analysis',
-                   'Programming Language :: Python :: 2.7',
                    'Programming Language :: Python :: 3',
-                   'Programming Language :: Python :: 3.2',
-                   'Programming Language :: Python :: 3.3',
-                   'Programming Language :: Python :: 3.4'
+                   'Programming Language :: Python :: 3 :: Only',
+                   'Programming Language :: Python :: 3.5',
+                   'Programming Language :: Python :: 3.6',
+                   'Programming Language :: Python :: 3.7',
+                   'Programming Language :: Python :: 3.8'
                    ],
+    python_requires = '>=3.5',
     platforms = ['any'],
     keywords = ['machine learning', 'parameter tuning',
                 'hyperparameter optimization', 'meta-optimization',